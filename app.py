@@ -2,22 +2,30 @@ import streamlit as st
 import os
 import time
 import requests
-import pandas as pd
+from requests.adapters import HTTPAdapter
+from requests_cache import CachedSession
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+import pyarrow as pa
+import pyarrow.parquet as pq
+import xlsxwriter
 from urllib.parse import urljoin
-from bs4 import BeautifulSoup
+import lxml.etree
+import lxml.html
 import re
-from io import BytesIO
+from io import BytesIO, StringIO
+import csv
 import shutil
+import tempfile
 import gc  # Garbage collection
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from parsing import COLS, parse_article_html
 
-# --- Selenium Imports ---
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+# Selenium is only the fallback for when the FacetWP endpoint can't be used, so it is imported
+# inside the browser functions and the normal path never pays for loading it.
 
 # --- Configuration & Setup ---
 st.set_page_config(
@@ -108,20 +116,85 @@ def local_css():
 
 local_css()
 
+# Article fetches are network-bound, so a handful of threads hide most of the round-trip latency.
+DEFAULT_WORKERS = 8
+MAX_WORKERS = 32
+# Parsing is CPU-bound; a few processes sidestep the GIL without multiplying memory use on small containers.
+PARSE_WORKERS = min(4, os.cpu_count() or 1)
+# Never fork the Streamlit server: it has live threads (and the fetch threads hold session, SQLite and limiter locks),
+# which a forked child can inherit mid-lock. The fork server starts from a clean process with parsing.py preloaded.
+PARSE_CONTEXT = multiprocessing.get_context("forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+if PARSE_CONTEXT.get_start_method() == "forkserver":
+    PARSE_CONTEXT.set_forkserver_preload(["parsing"])
+
+DOMAIN = "https://kciphilanthropy.com"
+LISTING_PATH = "/insights/"
+LISTING_PARAMS = "fwp_categories=major-gift-news"
+# FacetWP's refresh endpoint, which the "View More" button posts to
+FACETWP_REFRESH_URL = f"{DOMAIN}/wp-json/facetwp/v1/refresh"
+HARD_LIMIT_CLICKS = 50
+# WordPress REST API; one call returns up to 100 posts with their rendered content
+WP_API_URL = f"{DOMAIN}/wp-json/wp/v2"
+WP_PER_PAGE = 100
+DEFAULT_API_ARTICLES = 10
+MAX_API_ARTICLES = 1000
+
+_ARTICLE_HREFS_JS = "return Array.from(document.querySelectorAll(\"a[href*='/major-gift-news-']\"), a => a.href);"
+
+# Resolves once the "View More" click has actually added article links, not on FacetWP's loading-spinner mutations
+_CLICK_AND_WAIT_JS = """
+const done = arguments[arguments.length - 1];
+const selector = "a[href*='/major-gift-news-']";
+const template = document.querySelector('.facetwp-template');
+const button = document.querySelector('.fwp-load-more');
+if (!template || !button) { done(false); return; }
+const before = document.querySelectorAll(selector).length;
+new MutationObserver((_, observer) => {
+    if (document.querySelectorAll(selector).length > before) { observer.disconnect(); done(true); }
+}).observe(template, {childList: true, subtree: true});
+button.scrollIntoView();
+button.click();
+"""
+
+PREVIEW_ROWS = 200
+# Every field is text; declaring it spares pyarrow from inferring a type per column
+EXPORT_SCHEMA = pa.schema([(c, pa.string()) for c in COLS])
+# Subresources the browser fallback never needs. CSS is deliberately absent, see get_driver().
+BLOCKED_URL_PATTERNS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.woff", "*.woff2", "*.ttf", "*.otf", "*.mp4"]
+_FACETWP_TEMPLATE_RE = re.compile(rb'class="facetwp-template[^"]*"[^>]*data-name="([^"]+)"')
+
 def get_driver():
     """
     Initializes a headless Chrome browser with AGGRESSIVE memory saving options.
     """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
     chrome_options = Options()
     chrome_options.add_argument("--headless=new") 
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--disable-features=VizDisplayCompositor") 
+    # Chromium keeps only the last --disable-features switch, so every feature goes in this one
+    chrome_options.add_argument("--disable-features=VizDisplayCompositor,Translate,BackForwardCache")
     chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-background-networking")
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.add_argument("--disable-remote-fonts")
+    chrome_options.add_argument("--disable-sync")
+    chrome_options.add_argument("--mute-audio")
+    chrome_options.add_argument("--no-zygote")
+    # A small V8 heap makes the listing page collect early instead of growing towards the container's RAM ceiling
+    chrome_options.add_argument("--js-flags=--max-old-space-size=256 --max-semi-space-size=16")
+    chrome_options.add_argument("--log-level=3")
     chrome_options.add_argument("--dns-prefetch-disable")
     chrome_options.add_argument("--window-size=1920,1080")
     chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+    # Images are never read. Stylesheets stay on: FacetWP hides the exhausted "View More" button via CSS.
+    chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    # Return from driver.get() on DOMContentLoaded instead of waiting for every subresource
+    chrome_options.page_load_strategy = "eager"
     
     chromium_path = shutil.which("chromium") or shutil.which("chromium-browser") or "/usr/bin/chromium"
     if os.path.exists(chromium_path):
@@ -131,14 +204,239 @@ def get_driver():
     
     if os.path.exists(driver_path):
         service = Service(driver_path)
-        return webdriver.Chrome(service=service, options=chrome_options)
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+    else:
+        driver = webdriver.Chrome(options=chrome_options)
+
+    # Stop fonts, icons and images at the network layer too; the prefs above only cover <img> tags
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    return driver
+
+@st.cache_resource(show_spinner=False)
+def get_cached_driver():
+    """
+    Boots Chrome once and reuses it across reruns, instead of paying the startup on every scrape.
+    """
+    driver = get_driver()
+    atexit.register(driver.quit)
+    return driver
+
+@st.cache_resource(show_spinner=False)
+def get_browser_lock():
+    return threading.Lock()
+
+def make_session(pool_size, revalidate=False):
+    """
+    One cached, keep-alive connection pool shared by every fetch, with retries for throttling and server errors.
+    The pool is sized to the worker count so every thread gets a warm connection instead of blocking on one.
+    With revalidate, every cached page is re-checked with a conditional request instead of being trusted for an hour.
+    """
+    # Disk-backed, so warm reruns (and restarts) skip the network; stale entries revalidate via ETag/Last-Modified
+    session = CachedSession(
+        os.path.join(tempfile.gettempdir(), "kci_cache"),
+        backend="sqlite",
+        expire_after=3600,
+        stale_if_error=True,
+        always_revalidate=revalidate,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "User-Agent": "Mozilla/5.0 ...",
+        # urllib3 only lists br/zstd when their decoders are installed
+        "Accept-Encoding": make_headers(accept_encoding=True)["accept-encoding"],
+        "Connection": "keep-alive",
+    })
+    return session
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by the fetch workers, so the delay setting caps the overall request rate
+    instead of idling every worker after each response.
+    """
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+_parser_local = threading.local()
+
+def shared_html_parser():
+    """
+    Returns this thread's lxml HTML parser, created on first use and reused for every later listing page.
+    lxml parsers must not be shared between threads, and each Streamlit session runs its script on its own thread.
+    """
+    parser = getattr(_parser_local, "parser", None)
+    if parser is None:
+        parser = _parser_local.parser = lxml.html.HTMLParser(recover=True, remove_comments=True, remove_pis=True)
+    return parser
+
+def extract_article_urls(html):
+    # Accepts str fragments or raw page bytes; with bytes lxml decodes using the page's own charset
+    if not html.strip():
+        return set()
+    # XPath runs in libxml2 and hands back plain strings, no Tag wrappers needed for a single attribute
+    try:
+        doc = lxml.html.fromstring(html, parser=shared_html_parser())
+    except lxml.etree.ParserError:
+        # A fragment holding only a comment or bare text has no elements at all, so no links either
+        return set()
+    return {urljoin(DOMAIN, href) for href in doc.xpath("//a[contains(@href, '/major-gift-news-')]/@href")}
+
+def fetch_listing_page(session, template, page_n):
+    """
+    Requests one page of results from FacetWP directly, mirroring the payload the "View More" button sends.
+    """
+    payload = {
+        "action": "facetwp_refresh",
+        "data": {
+            "facets": {"categories": ["major-gift-news"]},
+            "frozen_facets": {},
+            "http_params": {
+                "get": {"fwp_categories": "major-gift-news"},
+                "uri": LISTING_PATH.strip("/"),
+                "url_vars": {"categories": ["major-gift-news"]},
+            },
+            "template": template,
+            "extras": {"sort": "default"},
+            "soft_refresh": 1,
+            "is_bfcache": 0,
+            "first_load": 0,
+            "paged": page_n,
+        },
+    }
+    r = session.post(FACETWP_REFRESH_URL, json=payload, timeout=15)
+    r.raise_for_status()
+    return r.json()
+
+def get_articles_via_rest(session, max_articles, status_container):
+    """
+    Pulls the newest `max_articles` Major Gift News posts and their rendered bodies straight from the WordPress REST API.
+    Each page stands in for up to WP_PER_PAGE article downloads, so Phase 2 only has to parse.
+    Returns {url: html bytes}, or None when the API isn't reachable so the caller can scrape the listing instead.
+    """
+    status_container.info(f"Querying {WP_API_URL}...")
+    try:
+        r = session.get(f"{WP_API_URL}/categories", params={"slug": "major-gift-news", "_fields": "id"}, timeout=15)
+        r.raise_for_status()
+        category_id = r.json()[0]["id"]
+    except (requests.RequestException, ValueError, LookupError, TypeError):
+        return None
+
+    articles = {}
+    per_page = min(max_articles, WP_PER_PAGE)
+    for page_n in range(1, -(-max_articles // per_page) + 1):
+        params = {"categories": category_id, "per_page": per_page, "page": page_n, "_fields": "link,content"}
+        try:
+            r = session.get(f"{WP_API_URL}/posts", params=params, timeout=30)
+            r.raise_for_status()
+            posts = r.json()
+            for post in posts[:max_articles - len(articles)]:
+                articles.setdefault(post["link"], post["content"]["rendered"].encode("utf-8"))
+        except (requests.RequestException, ValueError, LookupError, TypeError):
+            if page_n == 1:
+                return None
+            status_container.warning(f"Pagination stopped early on page {page_n}.")
+            break
+        status_container.text(f"Collected {len(articles)} articles (Page {page_n})...")
+
+        if not posts or page_n >= int(r.headers.get("X-WP-TotalPages", page_n)):
+            break
+
+    return articles or None
+
+class ListingUnavailable(Exception):
+    """The listing can't be paged over FacetWP's endpoint; raised rather than returned so st.cache_data never stores it."""
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def collect_listing_urls(_session, max_clicks):
+    """
+    Collects article URLs without a browser: page 1 is server-rendered, later pages come from FacetWP's endpoint.
+    Returns (urls, page pagination stopped early on or None). Cached for an hour; the session is left out of the key.
+    Makes no Streamlit calls, since a cache hit can't replay output into containers created outside it.
+    """
+    full_url = f"{DOMAIN}{LISTING_PATH}?{LISTING_PARAMS}"
+    try:
+        r = _session.get(full_url, timeout=15)
+        r.raise_for_status()
+    except requests.RequestException as e:
+        raise ListingUnavailable(full_url) from e
+
+    all_urls = extract_article_urls(r.content)
+    if not all_urls:
+        raise ListingUnavailable(full_url)
+    # The first page is server-rendered, so the default single-page scrape never needs pagination at all
+    if max_clicks == 1:
+        return sorted(all_urls), None
+
+    template_match = _FACETWP_TEMPLATE_RE.search(r.content)
+    if not template_match:
+        raise ListingUnavailable(full_url)
+    template = template_match.group(1).decode("utf-8")
+
+    for page_n in range(2, min(max_clicks, HARD_LIMIT_CLICKS) + 1):
+        try:
+            data = fetch_listing_page(_session, template, page_n)
+            page_urls = extract_article_urls(data["template"])
+        except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+            # The first AJAX page failing means the endpoint guess is wrong; let the browser take over
+            if page_n == 2:
+                raise ListingUnavailable(FACETWP_REFRESH_URL) from e
+            return sorted(all_urls), page_n
+
+        seen_before = len(all_urls)
+        all_urls.update(page_urls)
+        if len(all_urls) == seen_before:
+            break
+
+        pager = data.get("settings", {}).get("pager", {})
+        if page_n >= pager.get("total_pages", page_n + 1):
+            break
+
+    return sorted(all_urls), None
+
+def get_article_urls_via_ajax(session, max_clicks, status_container):
+    """
+    Reports on collect_listing_urls from outside the cache.
+    Returns None when the listing can't be paged this way, so the caller can fall back to Selenium.
+    """
+    status_container.info(f"Fetching {DOMAIN}{LISTING_PATH}?{LISTING_PARAMS}...")
+    try:
+        urls, stopped_on = collect_listing_urls(session, max_clicks)
+    except ListingUnavailable:
+        return None
+    if stopped_on:
+        status_container.warning(f"Pagination stopped early on page {stopped_on}.")
     else:
-        return webdriver.Chrome(options=chrome_options)
+        status_container.text(f"Collected {len(urls)} unique articles...")
+    return urls
 
 def get_all_article_urls(driver, max_clicks, status_container):
-    DOMAIN = "https://kciphilanthropy.com"
-    LISTING_PATH = "/insights/"
-    LISTING_PARAMS = "fwp_categories=major-gift-news"
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+
     full_url = f"{DOMAIN}{LISTING_PATH}?{LISTING_PARAMS}"
     
     status_container.info(f"Navigating to {full_url}...")
@@ -152,15 +450,23 @@ def get_all_article_urls(driver, max_clicks, status_container):
     click_count = 0
     
     status_container.text("Analyzing initial page load...")
+
+    # With the eager load strategy FacetWP may still be rendering the pager
+    try:
+        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, "fwp-load-more")))
+    except TimeoutException:
+        pass
     
-    HARD_LIMIT_CLICKS = 50 
-    
+    driver.set_script_timeout(10)
+
     while click_count < max_clicks and click_count < HARD_LIMIT_CLICKS:
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        current_urls = {urljoin(DOMAIN, a['href']) for a in soup.select("a[href*='/major-gift-news-']")}
-        
-        new_urls = current_urls - all_urls
-        all_urls.update(new_urls)
+        seen_before = len(all_urls)
+        # Read the links from the live DOM instead of serialising page_source and re-parsing it every click
+        all_urls.update(driver.execute_script(_ARTICLE_HREFS_JS))
+
+        # A click that added nothing means the listing is exhausted
+        if len(all_urls) == seen_before and click_count > 0:
+            break
         
         status_container.text(f"Collected {len(all_urls)} unique articles (Page {click_count + 1})...")
 
@@ -169,14 +475,15 @@ def get_all_article_urls(driver, max_clicks, status_container):
             
             if not view_more_button.is_displayed():
                 break
+            # FacetWP disables the button while a load is in flight; wait for it rather than a fixed sleep
+            WebDriverWait(driver, 5).until(EC.element_to_be_clickable(view_more_button))
 
-            driver.execute_script("arguments[0].scrollIntoView(true);", view_more_button)
-            time.sleep(1.0) 
-            view_more_button.click()
+            # Scroll, click and wait for FacetWP to append the results in a single browser round trip
+            if not driver.execute_async_script(_CLICK_AND_WAIT_JS):
+                break
             click_count += 1
-            
-            wait = WebDriverWait(driver, 10)
-            wait.until(EC.invisibility_of_element_located((By.CSS_SELECTOR, ".facetwp-loading")))
+            # Collect the garbage FacetWP leaves behind from each re-render before the next one piles on
+            driver.execute_cdp_cmd("HeapProfiler.collectGarbage", {})
             
         except (NoSuchElementException, TimeoutException):
             break
@@ -186,63 +493,113 @@ def get_all_article_urls(driver, max_clicks, status_container):
             
     return list(all_urls)
 
-def parse_single_article(url, session):
+def is_fresh_in_cache(session, url):
+    """
+    True only when the session will answer a GET for this URL from disk. Expired entries stay in the
+    SQLite file between runs but go back to the network, so they have to wait on the limiter like any other request.
+    """
+    cached = session.cache.get_response(session.cache.create_key(requests.Request("GET", url)))
+    return cached is not None and not cached.is_expired
+
+def fetch_article_html(url, session, limiter):
+    """
+    Downloads a single article once the shared limiter allows it.
+    Pages with a fresh copy in the HTTP cache are served from disk without touching the limiter, unless a forced refresh revalidates them.
+    Returns the raw body plus the charset declared in the Content-Type header, if any; decoding is left to lxml.
+    """
+    if session.settings.always_revalidate or not is_fresh_in_cache(session, url):
+        limiter.acquire()
+    r = session.get(url, timeout=15)
+    r.raise_for_status()
+    # requests falls back to ISO-8859-1 for text/* without a charset, so only trust an explicit one
+    declared = "charset" in r.headers.get("Content-Type", "").lower()
+    return r.content, r.encoding if declared else None
+
+def scrape_articles(urls, session, concurrency, delay, state, prefetched=None):
+    """
+    Phase 2, run on a background thread so the script run that started it can finish straight away.
+    Bodies already in `prefetched` (from the REST API) go straight to the parsers; the rest are downloaded first.
+    Progress and results are written to `state` only; Streamlit calls are not safe from this thread.
+    """
+    prefetched = prefetched or {}
+    # Column-oriented accumulation: the preview, the Parquet table and the row exports all read the lists as they are
+    columns = {c: [] for c in COLS}
+    seen = set()
+    failed = state["failed"]
+
+    limiter = TokenBucket(rate=1 / delay, capacity=max(1, int(1 / delay)))
+
     try:
-        r = session.get(url, timeout=10)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
-        
-        records = []
-        main_content = soup.find("article") or soup.find("main") or soup
-
-        for h2 in main_content.find_all('h2'):
-            donor = h2.get_text(strip=True)
-            if not donor or "submissions notice" in donor.lower():
-                continue
-
-            content_block = []
-            for sibling in h2.find_next_siblings():
-                if sibling.name == 'h2':
-                    break
-                content_block.append(sibling)
-            
-            if not content_block: continue
-
-            info = {"Donor": donor, "Gift": "", "Recipient": "", "City": "", "Province": "", "Date": "", "Description": "", "Source URL": url}
-            block_soup = BeautifulSoup("".join(str(s) for s in content_block), "html.parser")
-            block_text = block_soup.get_text(separator="\n", strip=True)
-
-            for h3 in block_soup.find_all('h3'):
-                label = h3.get_text(strip=True).replace(":", "")
-                if label in info:
-                    next_elem = h3.find_next_sibling()
-                    if next_elem:
-                        info[label] = next_elem.get_text(strip=True)
-
-            date_tag = block_soup.find('h6')
-            if date_tag:
-                info["Date"] = date_tag.get_text(strip=True)
-            
-            gift_pattern = re.compile(r'\$\d[\d,.]*\s*(million|billion|thousand)?', re.IGNORECASE)
-            gift_match = gift_pattern.search(block_text)
-            if gift_match:
-                info["Gift"] = gift_match.group(0)
-
-            description_text = block_text
-            for key, value in info.items():
-                if value and key != "Source URL":
-                    description_text = description_text.replace(value, "")
-            
-            for label in ["Recipient", "City", "Province", "Date", "Gift"]:
-                 description_text = re.sub(f'^{label}:', '', description_text, flags=re.MULTILINE | re.IGNORECASE).strip()
+        # Fetch concurrently and hand each page to the parse processes as soon as its download completes
+        with ThreadPoolExecutor(max_workers=concurrency) as pool, ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=PARSE_CONTEXT) as parsers:
+            futures = {pool.submit(fetch_article_html, url, session, limiter): url for url in sorted(urls) if url not in prefetched}
+            # Keyed by URL so records are gathered in sorted-URL order, however the downloads finish
+            parse_futures = {url: parsers.submit(parse_article_html, url, html, "utf-8") for url, html in prefetched.items()}
+            state["done"] = len(parse_futures)
+            for i, future in enumerate(as_completed(futures), len(parse_futures)):
+                url = futures[future]
+                try:
+                    parse_futures[url] = parsers.submit(parse_article_html, url, *future.result())
+                except requests.RequestException as e:
+                    failed.append((url, str(e)))
 
-            info["Description"] = ' '.join(description_text.split())
-            records.append(info)
-            
-        return records
+                state["done"] = i + 1
+                # The slug is only formatted when the status panel repaints, not once per article
+                state["current"] = url
+
+            for url in sorted(parse_futures):
+                for record in parse_futures[url].result():
+                    # A republished article carries the same gift under a new URL, so everything but the URL is the key;
+                    # separate gifts from one donor (several "Anonymous" rows in a roundup) differ in the other fields
+                    key = (record[0].casefold(), *record[1:-1])
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    for column, value in zip(columns.values(), record):
+                        column.append(value)
 
+        state["columns"] = columns
+        if columns["Donor"]:
+            state["exports"] = build_exports(columns)
     except Exception as e:
-        return []
+        state["error"] = str(e)
+    finally:
+        state["running"] = False
+
+def build_exports(columns):
+    """Renders the Excel, CSV and Parquet downloads once, so reruns of the page don't rebuild them."""
+    buffer = BytesIO()
+    # strings_to_urls=False keeps the Source URL column as plain text instead of a hyperlink + format per cell
+    with xlsxwriter.Workbook(buffer, {'constant_memory': True, 'strings_to_urls': False}) as workbook:
+        worksheet = workbook.add_worksheet('Sheet1')
+        worksheet.write_row(0, 0, COLS)
+        for row, values in enumerate(zip(*columns.values()), 1):
+            worksheet.write_row(row, 0, values)
+
+    csv_buffer = StringIO()
+    csv_writer = csv.writer(csv_buffer)
+    csv_writer.writerow(COLS)
+    csv_writer.writerows(zip(*columns.values()))
+
+    parquet_buffer = BytesIO()
+    pq.write_table(pa.table(columns, schema=EXPORT_SCHEMA), parquet_buffer, compression="zstd")
+
+    return {
+        "xlsx": buffer.getvalue(),
+        "csv": csv_buffer.getvalue().encode("utf-8-sig"),
+        "parquet": parquet_buffer.getvalue(),
+    }
+
+@st.fragment(run_every=0.5)
+def scrape_status(state):
+    """Repaints only the progress panel while the background scrape runs, then reruns the page to show the results."""
+    if not state["running"]:
+        st.rerun()
+    st.progress(state["done"] / state["total"])
+    if state["current"]:
+        st.text(f"Processing {state['done']}/{state['total']}: {state['current'].rsplit('/', 2)[-2]}")
+    else:
+        st.text("Starting fast extraction...")
 
 # --- Main UI Layout ---
 st.title("💸 KCI Major Gift Scraper")
@@ -256,73 +613,106 @@ It paginates through the articles and extracts details into an Excel sheet.
 
 with st.sidebar:
     st.header("⚙️ Settings")
-    max_clicks = st.number_input("Max 'View More' Clicks", min_value=1, max_value=50, value=1, help="1 should be enough for the most recent article.\nIncrease to scrape older articles.")
-    delay = st.number_input("Request Delay (s)", min_value=0.1, value=0.5, step=0.1, help="Delay between webpage interactions. A smaller value will make scraping faster but may flag the bot and result in an IP address ban!")
+    max_articles = st.number_input("Max Articles", min_value=1, max_value=MAX_API_ARTICLES, value=DEFAULT_API_ARTICLES, help="How many of the most recent articles to read. This is the setting that normally applies: the site's post API is tried first.\nIncrease to scrape older articles.")
+    max_clicks = st.number_input("Max 'View More' Clicks", min_value=1, max_value=50, value=1, help="Only used as a fallback, when the post API is unavailable and the listing page has to be paged instead; Max Articles is ignored then.\n1 should be enough for the most recent article.\nIncrease to scrape older articles.")
+    delay = st.number_input("Request Delay (s)", min_value=0.1, value=0.5, step=0.1, help="Minimum average spacing between article requests, shared by all workers. A smaller value will make scraping faster but may flag the bot and result in an IP address ban!")
+    concurrency = st.number_input("Concurrency", min_value=1, max_value=MAX_WORKERS, value=DEFAULT_WORKERS, help="Number of articles downloaded in parallel. The request delay still caps the overall request rate.")
+    force_refresh = st.checkbox("Force refresh", value=False, help="Re-check every page with the site instead of reusing copies downloaded in the last hour. Pages that haven't changed are confirmed without downloading them again.")
+    keep_browser_warm = st.checkbox("Keep browser warm", value=True, help="Only used when the browser fallback is needed. Keeps Chrome running between scrapes so later runs start faster, at the cost of memory.")
     st.info("The scraping process runs in the cloud. Please stay on this tab while it runs.")
-    st.info("The tool automatically stops searching for more articles when no more can be found. You may safely set an arbitrary, high value for click count if you would like data from all archived articles.")
+    st.info(f"The tool automatically stops searching for more articles when no more can be found. For data from all archived articles, set Max Articles to its maximum ({MAX_API_ARTICLES}); if the post API is unavailable, set an arbitrary, high value for the click count instead.")
+
+scrape = st.session_state.get("scrape")
 
-if st.button("Start Scraping", type="primary"):
+if st.button("Start Scraping", type="primary", disabled=bool(scrape and scrape["running"])):
+    # A new run replaces the previous results, even if it finds nothing
+    st.session_state.pop("scrape", None)
+    scrape = None
     status_area = st.empty()
-    progress_bar = st.progress(0)
     driver = None
-    
-    try:
-        # Phase 1: Selenium
-        status_area.info("Starting Browser... (This may take a moment)")
-        driver = get_driver()
-        
-        urls = get_all_article_urls(driver, max_clicks, status_area)
-        
-    except Exception as e:
-        st.error(f"Critical Browser Error: {e}")
-        urls = []
-    finally:
-        if driver:
-            driver.quit()
-            del driver
-            gc.collect() 
-            status_area.text("Browser closed. Releasing memory...")
 
-    # Phase 2: Requests
+    session = make_session(concurrency, revalidate=force_refresh)
+    if force_refresh:
+        collect_listing_urls.clear()
+
+    # Phase 1: WordPress REST API, then FacetWP AJAX, with Selenium as the last resort
+    articles = get_articles_via_rest(session, max_articles, status_area)
+    urls = list(articles) if articles else get_article_urls_via_ajax(session, max_clicks, status_area)
+    if urls is None:
+        try:
+            status_area.info("Starting Browser... (This may take a moment)")
+            if keep_browser_warm:
+                # One warm browser per server process; the lock keeps concurrent sessions from driving it at once
+                with get_browser_lock():
+                    driver = get_cached_driver()
+                    urls = get_all_article_urls(driver, max_clicks, status_area)
+                    # Drop the listing page's DOM and scripts while the browser idles
+                    driver.get("about:blank")
+                driver = None
+            else:
+                driver = get_driver()
+                urls = get_all_article_urls(driver, max_clicks, status_area)
+
+        except Exception as e:
+            st.error(f"Critical Browser Error: {e}")
+            urls = []
+            # Don't hand a crashed browser to the next run
+            if keep_browser_warm:
+                get_cached_driver.clear()
+        finally:
+            if driver:
+                driver.quit()
+                del driver
+                gc.collect() 
+                status_area.text("Browser closed. Releasing memory...")
+
+    # Phase 2: Requests, handed to a background thread
     if not urls:
         status_area.warning("No articles found or browser crashed before finding any.")
     else:
         status_area.success(f"Found {len(urls)} articles. Starting fast extraction...")
-        
-        session = requests.Session()
-        session.headers.update({"User-Agent": "Mozilla/5.0 ..."})
-        
-        all_records = []
-        data_container = st.empty()
-        
-        for i, url in enumerate(sorted(urls)):
-            records = parse_single_article(url, session)
-            all_records.extend(records)
-            
-            progress = (i + 1) / len(urls)
-            progress_bar.progress(progress)
-            status_area.text(f"Processing {i+1}/{len(urls)}: {url.split('/')[-2]}")
-            time.sleep(delay)
+        scrape = {"total": len(urls), "done": 0, "current": "", "failed": [], "running": True}
+        st.session_state["scrape"] = scrape
+        threading.Thread(target=scrape_articles, args=(urls, session, concurrency, delay, scrape, articles), daemon=True).start()
 
-        progress_bar.empty()
-        
-        if all_records:
-            df = pd.DataFrame(all_records)
-            cols = ["Donor", "Gift", "Recipient", "City", "Province", "Date", "Description", "Source URL"]
-            df = df[[c for c in cols if c in df.columns]]
-            
-            status_area.success(f"✅ Scraping Complete! {len(all_records)} gifts found.")
-            data_container.dataframe(df)
-            
-            buffer = BytesIO()
-            with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-                df.to_excel(writer, index=False, sheet_name='Sheet1')
-                
-            st.download_button(
-                label="📥 Download Excel File",
-                data=buffer.getvalue(),
-                file_name="major_gift_news.xlsx",
-                mime="application/vnd.ms-excel"
-            )
-        else:
-            status_area.warning("Scraping finished, but no gift records were successfully parsed.")
+if scrape is not None:
+    if scrape["running"]:
+        scrape_status(scrape)
+    elif "error" in scrape:
+        st.error(f"Scraping failed: {scrape['error']}")
+    elif scrape["columns"]["Donor"]:
+        columns = scrape["columns"]
+        exports = scrape["exports"]
+        record_count = len(columns["Donor"])
+        st.success(f"✅ Scraping Complete! {record_count} gifts found.")
+        # st.dataframe takes the column lists directly; only the preview slice is sent to the browser
+        st.dataframe({c: values[:PREVIEW_ROWS] for c, values in columns.items()})
+        if record_count > PREVIEW_ROWS:
+            st.caption(f"Showing the first {PREVIEW_ROWS} of {record_count} gifts. The Excel file contains all of them.")
+
+        st.download_button(
+            label="📥 Download Excel File",
+            data=exports["xlsx"],
+            file_name="major_gift_news.xlsx",
+            mime="application/vnd.ms-excel"
+        )
+        st.download_button(
+            label="📥 Download CSV File",
+            data=exports["csv"],
+            file_name="major_gift_news.csv",
+            mime="text/csv",
+            help="Lightest and fastest to generate; the utf-8 BOM lets Excel open it with accents intact."
+        )
+        st.download_button(
+            label="📥 Download Parquet File",
+            data=exports["parquet"],
+            file_name="major_gift_news.parquet",
+            mime="application/octet-stream",
+            help="Much smaller and faster to load into Python or R analysis pipelines."
+        )
+    else:
+        st.warning("Scraping finished, but no gift records were successfully parsed.")
+
+    if not scrape["running"] and scrape["failed"]:
+        with st.expander(f"⚠️ {len(scrape['failed'])} articles could not be downloaded"):
+            st.text("\n".join(f"{url}: {reason}" for url, reason in scrape["failed"]))
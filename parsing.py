@@ -0,0 +1,180 @@
+"""
+Article parsing for the KCI scraper. Kept out of app.py so the worker processes
+can import it without re-running the Streamlit script.
+"""
+import codecs
+import re
+from io import BytesIO
+import lxml.etree
+
+# Compiled once; these run against every donor block of every article
+_GIFT_RE = re.compile(r'\$\d[\d,.]*\s*(?:million|billion|thousand)?', re.IGNORECASE)
+_LABEL_RE = re.compile(r'^(?:Recipient|City|Province|Date|Gift):\s*', re.MULTILINE | re.IGNORECASE)
+_WS_RE = re.compile(r'\s+')
+# Raw-byte patterns for cheap checks before anything is decoded or parsed
+_H2_RE = re.compile(rb'<h2[\s>]', re.IGNORECASE)
+_ARTICLE_RE = re.compile(rb'<article[\s>]', re.IGNORECASE)
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+_HEADINGS_XPATH = lxml.etree.XPath("descendant-or-self::*[self::h3 or self::h6]")
+
+# Fixed output column order; records travel as tuples in this order
+COLS = ("Donor", "Gift", "Recipient", "City", "Province", "Date", "Description", "Source URL")
+
+def _text(element, separator=""):
+    # Equivalent of BeautifulSoup's get_text(separator, strip=True)
+    return separator.join(t for t in (s.strip() for s in element.itertext()) if t)
+
+def _block_to_record(url, h2, content_block):
+    donor = _text(h2)
+    if not donor or "submissions notice" in donor.lower():
+        return None
+
+    if not content_block: return None
+
+    info = {"Donor": donor, "Gift": "", "Recipient": "", "City": "", "Province": "", "Date": "", "Description": "", "Source URL": url}
+    block_text = "\n".join(t for t in (_text(s, "\n") for s in content_block) if t)
+
+    # One compiled XPath walk per block node finds both the <h3> labels and the <h6> date, nested or not
+    date_tag = None
+    for heading in (heading for s in content_block for heading in _HEADINGS_XPATH(s)):
+        if heading.tag == 'h6':
+            if date_tag is None:
+                date_tag = heading
+            continue
+        label = _text(heading).replace(":", "")
+        if label in info:
+            next_elem = heading.getnext()
+            if next_elem is not None and next_elem.tag != 'h2':
+                info[label] = _text(next_elem)
+
+    if date_tag is not None:
+        info["Date"] = _text(date_tag)
+    
+    gift_match = _GIFT_RE.search(block_text)
+    if gift_match:
+        info["Gift"] = gift_match.group(0)
+
+    # Drop every captured value in one pass; longest first so overlapping values don't shadow each other
+    captured = {value for key, value in info.items() if value and key != "Source URL"}
+    captured_re = re.compile("|".join(map(re.escape, sorted(captured, key=len, reverse=True))))
+    description_text = captured_re.sub("", block_text)
+    description_text = _LABEL_RE.sub('', description_text).strip()
+
+    info["Description"] = _WS_RE.sub(' ', description_text).strip()
+    return tuple(info[c] for c in COLS)
+
+def _as_utf8(html, encoding):
+    """
+    Returns the body as UTF-8 bytes, transcoding in Python only when it is in some other charset.
+    libxml2 doesn't accept every codec name Python does (e.g. "latin-1"), so it is only ever handed UTF-8.
+    """
+    try:
+        codec = codecs.lookup(encoding).name if encoding else None
+    except LookupError:
+        codec = None  # An unrecognised declaration is treated like a missing one
+    if codec is None:
+        # Undeclared: valid UTF-8 is taken as such, anything else is most likely Windows-1252 (what r.text used to guess)
+        try:
+            html.decode("utf-8")
+            return html
+        except UnicodeDecodeError:
+            codec = "cp1252"
+    if codec == "utf-8":
+        return html
+    return html.decode(codec, "replace").encode("utf-8")
+
+def parse_article_html(url, html, encoding=None):
+    """
+    Streams the page through lxml's iterparse and emits a record as each <h2> section closes.
+    Sections are cleared once handled, and anything outside a section is cleared as soon as it ends,
+    so the tree never holds much more than the section being read.
+    Takes the raw response bytes; UTF-8 pages go to libxml2 as they are, anything else is transcoded first.
+    """
+    # Decide the charset before slicing, since the <meta> declaring it lives in the <head> that gets cut
+    if encoding is None:
+        charset_match = _META_CHARSET_RE.search(html, 0, 8192)
+        encoding = charset_match.group(1).decode("ascii") if charset_match else None
+
+    # Only the first <article> is ever read, so when the page has one, hand just that region to the
+    # parser; the head, navigation, sidebars and footer never get tokenized
+    article_start = _ARTICLE_RE.search(html)
+    if article_start:
+        article_end = html.rfind(b"</article>")
+        if article_end > article_start.start():
+            html = html[article_start.start():article_end + len(b"</article>")]
+
+    # A page with no dollar amount anywhere has no gifts to report, and one without <h2> has no donors
+    if b'$' not in html or not _H2_RE.search(html):
+        return []
+
+    html = _as_utf8(html, encoding)
+
+    try:
+        sections = []  # (position of the h2's start tag, inside first <article>, inside first <main>, record)
+        active = {}  # parent element -> (current h2, its position, siblings collected after it)
+        article = main = None
+        # Positions of <h2> elements started but not yet ended; their children end first
+        open_headings = []
+
+        def retained(element):
+            # Anything under an open section may still be read as part of that section's block
+            return any(a in active for a in element.iterancestors())
+
+        def flush(parent):
+            h2, position, content_block = active.pop(parent)
+            record = _block_to_record(url, h2, content_block)
+            if record:
+                ancestors = list(h2.iterancestors())
+                sections.append((position, any(a is article for a in ancestors), any(a is main for a in ancestors), record))
+            if not retained(h2):
+                for element in content_block:
+                    element.clear()
+                h2.clear()
+
+        events = lxml.etree.iterparse(
+            BytesIO(html), events=("start", "end"), html=True, encoding="utf-8",
+            recover=True, remove_comments=True, remove_pis=True,
+        )
+        for position, (event, element) in enumerate(events):
+            if event == "start":
+                if element.tag == "article" and article is None:
+                    article = element
+                elif element.tag == "main" and main is None:
+                    main = element
+                elif element.tag == "h2":
+                    open_headings.append(position)
+                continue
+
+            # Every child has ended, so the last section under this element is complete
+            if element in active:
+                flush(element)
+
+            parent = element.getparent()
+            if element.tag == "h2":
+                if parent in active:
+                    flush(parent)
+                active[parent] = (element, open_headings.pop(), [])
+            elif parent in active:
+                active[parent][2].append(element)
+            # Markup inside a heading (<h2><strong>Donor</strong></h2>) ends before the heading does and
+            # must survive until the heading is read
+            elif not open_headings and not retained(element):
+                element.clear()
+
+        for parent in list(active):
+            flush(parent)
+
+        # Sections close inner-first (an <h2> nested in another section's block flushes before it),
+        # so put them back in document order
+        sections.sort(key=lambda section: section[0])
+
+        # Same scope as before: the first <article>, else the first <main>, else the whole page
+        if article is not None:
+            return [record for _, in_article, _, record in sections if in_article]
+        if main is not None:
+            return [record for _, _, in_main, record in sections if in_main]
+        return [record for _, _, _, record in sections]
+
+    # Only malformed input is expected here (an empty document); anything else is a bug
+    except lxml.etree.XMLSyntaxError:
+        return []
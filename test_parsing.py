@@ -0,0 +1,70 @@
+"""
+Regression checks for parse_article_html. Expected records are the output of the original
+BeautifulSoup parser for the same markup.
+"""
+import pytest
+
+from parsing import parse_article_html
+
+
+def _block(n, heading):
+    return (
+        f"{heading}<h3>Recipient:</h3><p>Hospital {n}</p><h3>City:</h3><p>Town {n}</p>"
+        f"<h6>March {n}, 2024</h6><p>A gift of ${n},000,000 for care in Town {n}.</p>"
+    )
+
+
+def _record(donor, n):
+    return (donor, f"${n},000,000 ", f"Hospital {n}", f"Town {n}", "", f"March {n}, 2024", "A gift of for care in .", "u")
+
+
+@pytest.mark.parametrize("first, second, donors", [
+    ("<h2>Acme</h2>", "<h2>Second 2</h2>", ("Acme", "Second 2")),
+    ("<h2><strong>Acme</strong></h2>", "<h2><strong>Second 2</strong></h2>", ("Acme", "Second 2")),
+    ("<h2><span class='x'>Acme <em>Corp</em></span></h2>", "<h2><span>Second 2</span></h2>", ("AcmeCorp", "Second 2")),
+    ("<h2><a href='#'>Acme</a> Ltd</h2>", "<h2>Second 2</h2>", ("AcmeLtd", "Second 2")),
+])
+def test_heading_markup_keeps_every_donor(first, second, donors):
+    html = f"<html><body><article><div>{_block(1, first)}{_block(2, second)}</div></article></body></html>"
+    assert parse_article_html("u", html.encode()) == [_record(donors[0], 1), _record(donors[1], 2)]
+
+
+def test_nested_blocks_under_marked_up_headings():
+    html = (
+        "<html><body><article>"
+        "<h2><b>Acme</b></h2><div><h3>Recipient</h3><p>X</p><p>$5 million</p></div>"
+        "<h2><i>Second</i> 2</h2><section><h6>May 1</h6><p>$7</p></section>"
+        "</article></body></html>"
+    )
+    assert parse_article_html("u", html.encode()) == [
+        ("Acme", "$5 million", "X", "", "", "", "Recipient", "u"),
+        ("Second2", "$7", "", "", "", "May 1", "", "u"),
+    ]
+
+
+@pytest.mark.parametrize("meta, body_encoding", [
+    ('<meta charset="x-bogus">', "latin-1"),
+    ('<meta charset="x-bogus">', "utf-8"),
+    ('<meta charset="latin-1">', "latin-1"),
+    ("", "latin-1"),
+    ("", "utf-8"),
+])
+def test_unknown_or_missing_charset_still_decodes(meta, body_encoding):
+    html = f"<html><head>{meta}</head><body><article>{_block(1, '<h2>Café Société</h2>')}</article></body></html>"
+    assert parse_article_html("u", html.encode(body_encoding)) == [_record("Café Société", 1)]
+
+
+def test_nested_sections_keep_document_order():
+    html = (
+        "<html><body><article>"
+        "<h2>A</h2><section><h2>I1</h2><p>$1</p><h2>I2</h2><p>$2</p></section><p>$9</p>"
+        "<h2>B</h2><div><h2>I3</h2><p>$4</p></div>"
+        "</article></body></html>"
+    )
+    assert parse_article_html("u", html.encode()) == [
+        ("A", "$1\n", "", "", "", "", "I1 I2 $2 $9", "u"),
+        ("I1", "$1", "", "", "", "", "", "u"),
+        ("I2", "$2", "", "", "", "", "", "u"),
+        ("B", "$4", "", "", "", "", "I3", "u"),
+        ("I3", "$4", "", "", "", "", "", "u"),
+    ]